@@ -20,16 +20,35 @@ Current sources:
 
 from __future__ import annotations
 
+import functools
 import hashlib
+import heapq
+import json
+import os
 import re
+import tempfile
+import threading
 import time
+from array import array
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple, Optional
+from urllib.parse import quote_plus, urlsplit
 
 import feedparser
 import requests
-from bs4 import BeautifulSoup
 from dateutil import parser as dtparse
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # optional: single-pass keyword matching (pip install pyahocorasick)
+    import ahocorasick
+except ImportError:  # pragma: no cover
+    ahocorasick = None
+
+from store import json_loads
 
 
 # ----------------------------
@@ -57,6 +76,14 @@ RISK_KW = {
     "sanctions": ["sanction", "embargo", "restriction", "designation", "sdn"],
 }
 
+# Severity tiers in priority order: (bonus, trigger keywords). Only the
+# first tier with a hit adds its bonus; see _severity_from_mask.
+SEVERITY_TIERS: Tuple[Tuple[int, Tuple[str, ...]], ...] = (
+    (40, ("shutdown", "collapse", "ban", "embargo")),
+    (25, ("strike", "blockade", "attack", "sanction", "halt")),
+    (10, ("delay", "protest", "tighten", "restriction")),
+)
+
 # Domain -> quality label
 ALLOWLIST_QUALITY = {
     "home.treasury.gov": "OFFICIAL",
@@ -79,12 +106,35 @@ DOMAIN_BLOCKLIST = {
     "themarketsdaily.com",
 }
 
+# Publishers fetched through one domain-restricted GDELT query, with the
+# source label shown for each. Unlisted domains are labelled by domain.
+GDELT_DOMAIN_LABELS: Dict[str, str] = {
+    "reuters.com": "Reuters",
+}
+
 # NOTE: You MUST fill STATE_DEPT_FEEDS with actual State Dept RSS feed URLs.
 STATE_DEPT_FEEDS: List[str] = []
 
+# Upper bound on sources fetched concurrently by run_all (all I/O-bound).
+INGEST_MAX_WORKERS = int(os.environ.get("GEO_INGEST_MAX_WORKERS", "8"))
+
+# Conditional-GET cache (ETag/Last-Modified + parsed events per URL). Persisted
+# so a restarted process still sends validators on its first run. Its events
+# are upserted as-is on a hit, so it lives in a per-user 0700 directory rather
+# than a shared, guessable temp path.
+HTTP_CACHE_PATH = os.environ.get(
+    "GEO_HTTP_CACHE_PATH",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "geo-monitor",
+        "http_cache.json",
+    ),
+)
+
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; GeoMonitorBot/1.0; +https://critical-material-geotracking.onrender.com)",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
 }
 
 
@@ -271,12 +321,199 @@ COUNTRY_HINTS: List[Tuple[str, str, float, float]] = [
     (r"\baz\w*\b", "AZ", 40.1431, 47.5769),
 ]
 
-_COUNTRY_HINTS_COMPILED: List[Tuple[re.Pattern, str, float, float]] = [
-    (re.compile(pat, re.IGNORECASE), iso2, lat, lon) for pat, iso2, lat, lon in COUNTRY_HINTS
-]
-_REGION_HINTS_COMPILED: List[Tuple[re.Pattern, str, float, float]] = [
-    (re.compile(pat, re.IGNORECASE), iso2, lat, lon) for pat, iso2, lat, lon in REGION_HINTS
-]
+# The tables above stay readable as rows; payloads are read by index on a hit,
+# so they are split into columns.
+HintColumns = Tuple[List[Any], array, array]
+
+
+def _hint_columns(hints: List[Tuple[Any, Any, float, float]]) -> HintColumns:
+    """(iso2 per hint, lat array, lon array), parallel to hints."""
+    return (
+        [h[1] for h in hints],
+        array("d", (h[2] for h in hints)),
+        array("d", (h[3] for h in hints)),
+    )
+
+
+_ENTITY_COLUMNS = _hint_columns(ENTITY_GEO_HINTS)
+_REGION_COLUMNS = _hint_columns(REGION_HINTS)
+_COUNTRY_COLUMNS = _hint_columns(COUNTRY_HINTS)
+
+# When pyahocorasick is available, every plain "\bword\b" alternative of the
+# region/country hints is loaded into one automaton and the text is scanned
+# once; only the few alternatives with real regex syntax (\w*, \.?,
+# lookaheads) still go through re. Layer 0 = REGION_HINTS, 1 = COUNTRY_HINTS.
+_GEO_LAYERS: Tuple[List[Tuple[str, str, float, float]], ...] = (REGION_HINTS, COUNTRY_HINTS)
+_GEO_LAYER_COLUMNS: Tuple[HintColumns, ...] = (_REGION_COLUMNS, _COUNTRY_COLUMNS)
+_REGEX_META = frozenset(".^$*+?{}[]()|\\")
+
+
+def _split_alternatives(pat: str) -> List[str]:
+    """Split a pattern on its top-level '|'."""
+    out: List[str] = []
+    cur: List[str] = []
+    depth = 0
+    i = 0
+    while i < len(pat):
+        c = pat[i]
+        if c == "\\":
+            cur.append(pat[i:i + 2])
+            i += 2
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            out.append("".join(cur))
+            cur = []
+            i += 1
+            continue
+        cur.append(c)
+        i += 1
+    out.append("".join(cur))
+    return out
+
+
+def _word_literal(alt: str) -> Optional[str]:
+    """r"\bu\.s\.\b" -> "u.s."; None if the alternative needs the regex engine."""
+    if not (alt.startswith(r"\b") and alt.endswith(r"\b")):
+        return None
+    body = alt[2:-2].replace(r"\.", "\0")
+    if not body or any(c in _REGEX_META for c in body):
+        return None
+    return body.replace("\0", ".").lower()
+
+
+def _build_geo_matchers():
+    literals: Dict[str, List[Tuple[int, int]]] = {}
+    regex_only: Tuple[List[Tuple[int, re.Pattern]], ...] = ([], [])
+    for layer, hints in enumerate(_GEO_LAYERS):
+        for idx, (pat, _, _, _) in enumerate(hints):
+            rest = []
+            for alt in _split_alternatives(pat):
+                lit = _word_literal(alt)
+                if lit is None:
+                    rest.append(alt)
+                else:
+                    literals.setdefault(lit, []).append((layer, idx))
+            if rest:
+                regex_only[layer].append((idx, re.compile("|".join(rest), re.IGNORECASE)))
+
+    ac = ahocorasick.Automaton()
+    for lit, targets in literals.items():
+        ac.add_word(lit, (len(lit), tuple(targets)))
+    ac.make_automaton()
+    return ac, regex_only
+
+
+_GEO_AC, _GEO_REGEX_ONLY = _build_geo_matchers() if ahocorasick is not None else (None, ([], []))
+
+
+def _build_geo_fallback():
+    """
+    Per layer, (idx, gate, pattern) for matching without the automaton.
+
+    A pattern made only of plain word alternatives can only match if one of
+    those words is a substring of the lowered text, so `gate` holds them and
+    the C-level `in` check skips most re searches. gate is None when the
+    pattern needs the regex engine (~3x faster overall than searching every
+    pattern; a fused named-group alternation was slower still and, being
+    non-overlapping, missed hits).
+    """
+    layers: Tuple[List[Tuple[int, Optional[Tuple[str, ...]], re.Pattern]], ...] = ([], [])
+    for layer, hints in enumerate(_GEO_LAYERS):
+        for idx, (pat, _, _, _) in enumerate(hints):
+            lits = [_word_literal(alt) for alt in _split_alternatives(pat)]
+            gate = None if None in lits else tuple(lits)
+            layers[layer].append((idx, gate, re.compile(pat, re.IGNORECASE)))
+    return layers
+
+
+_GEO_FALLBACK = _build_geo_fallback()
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _at_boundary(t: str, i: int) -> bool:
+    """re's \b at index i of t."""
+    before = i > 0 and _is_word_char(t[i - 1])
+    after = i < len(t) and _is_word_char(t[i])
+    return before != after
+
+
+def _geo_hint_matches(t: str, tl: str) -> Tuple[Set[int], Set[int]]:
+    """Indexes of the REGION_HINTS / COUNTRY_HINTS patterns that match t."""
+    matched: Tuple[Set[int], Set[int]] = (set(), set())
+    if _GEO_AC is None:
+        for layer, patterns in enumerate(_GEO_FALLBACK):
+            for idx, gate, pat in patterns:
+                if gate is not None and not any(w in tl for w in gate):
+                    continue
+                if pat.search(t):
+                    matched[layer].add(idx)
+        return matched
+
+    for end, (n, targets) in _GEO_AC.iter(tl):
+        start = end - n + 1
+        if _at_boundary(tl, start) and _at_boundary(tl, end + 1):
+            for layer, idx in targets:
+                matched[layer].add(idx)
+    for layer, patterns in enumerate(_GEO_REGEX_ONLY):
+        for idx, pat in patterns:
+            if idx not in matched[layer] and pat.search(t):
+                matched[layer].add(idx)
+    return matched
+
+
+def _entity_keys() -> List[Tuple[int, str]]:
+    """(index, keyword) per distinct non-empty keyword; first listing wins."""
+    keys: Dict[str, int] = {}
+    for idx, (key, _, _, _) in enumerate(ENTITY_GEO_HINTS):
+        if key and key not in keys:
+            keys[key] = idx
+    return [(idx, key) for key, idx in keys.items()]
+
+
+# Without pyahocorasick, a plain loop of C-level `in` scans over these beats
+# any single combined regex: a lookahead alternation (needed to see
+# overlapping keywords) defeats re's prefix scan and was measured ~8x slower.
+_ENTITY_KEYS = _entity_keys()
+
+
+def _build_entity_automaton():
+    ac = ahocorasick.Automaton()
+    for idx, key in _ENTITY_KEYS:
+        ac.add_word(key, idx)
+    ac.make_automaton()
+    return ac
+
+
+_ENTITY_AC = _build_entity_automaton() if ahocorasick is not None else None
+
+
+def _entity_index(tl: str) -> Optional[int]:
+    """Index of the first ENTITY_GEO_HINTS entry (in list order) whose keyword occurs in tl."""
+    if _ENTITY_AC is None:
+        for idx, key in _ENTITY_KEYS:
+            if key in tl:
+                return idx
+        return None
+    return min((idx for _, idx in _ENTITY_AC.iter(tl)), default=None)
+
+
+def _geo_layer_result(layer: int, idxs: Set[int]) -> Tuple[List[str], Tuple[float, float]]:
+    # list order decides precedence: first matching hint gives the centroid
+    iso2s, lats, lons = _GEO_LAYER_COLUMNS[layer]
+    order = sorted(idxs)
+    hits: List[str] = []
+    for idx in order:
+        if iso2s[idx] not in hits:
+            hits.append(iso2s[idx])
+    first = order[0]
+    return hits, (lats[first], lons[first])
 
 
 def extract_geo(text: str) -> Tuple[List[str], Optional[Tuple[float, float]], str]:
@@ -290,51 +527,164 @@ def extract_geo(text: str) -> Tuple[List[str], Optional[Tuple[float, float]], st
     - Else fallback to country keyword centroid.
     - Else Global.
     """
-    t = (text or "")
-    tl = t.lower()
+    countries, centroid, precision = _extract_geo_cached(text or "")
+    return list(countries), centroid, precision  # copy: cached result is shared
+
+
+def extract_geo_l(text: str, tl: str) -> Tuple[List[str], Optional[Tuple[float, float]], str]:
+    """extract_geo() for callers that already hold tl == text.lower()."""
+    countries, centroid, precision = _geo_for(text, tl)
+    return list(countries), centroid, precision
+
 
+@functools.lru_cache(maxsize=4096)
+def _extract_geo_cached(t: str) -> Tuple[List[str], Optional[Tuple[float, float]], str]:
+    return _geo_for(t, t.lower())
+
+
+def _geo_for(t: str, tl: str) -> Tuple[List[str], Optional[Tuple[float, float]], str]:
     # 1) Entity keywords (substring match)
-    for key, iso2s, lat, lon in ENTITY_GEO_HINTS:
-        if key and key in tl:
-            return iso2s, (float(lat), float(lon)), "entity"
+    entity = _entity_index(tl)
+    if entity is not None:
+        return _resolve_geo(entity, None)
+    return _resolve_geo(None, _geo_hint_matches(t, tl))
 
-    # 2) Regions (regex)
-    hits: List[str] = []
-    centroid: Optional[Tuple[float, float]] = None
-    for pat, iso2, lat, lon in _REGION_HINTS_COMPILED:
-        if pat.search(t):
-            if iso2 not in hits:
-                hits.append(iso2)
-            if centroid is None:
-                centroid = (float(lat), float(lon))
-    if hits or centroid:
+
+def _resolve_geo(
+    entity: Optional[int],
+    matched: Optional[Tuple[Set[int], Set[int]]],
+) -> Tuple[List[str], Optional[Tuple[float, float]], str]:
+    if entity is not None:
+        iso2s, lats, lons = _ENTITY_COLUMNS
+        return iso2s[entity], (lats[entity], lons[entity]), "entity"
+
+    region_idxs, country_idxs = matched or (set(), set())
+
+    # 2) Regions
+    if region_idxs:
+        hits, centroid = _geo_layer_result(0, region_idxs)
         return hits, centroid, "region"
 
-    # 3) Countries (regex)
-    hits = []
-    centroid = None
-    for pat, iso2, lat, lon in _COUNTRY_HINTS_COMPILED:
-        if pat.search(t):
-            if iso2 not in hits:
-                hits.append(iso2)
-            if centroid is None:
-                centroid = (float(lat), float(lon))
-    if hits or centroid:
+    # 3) Countries
+    if country_idxs:
+        hits, centroid = _geo_layer_result(1, country_idxs)
         return hits, centroid, "country"
 
     # 4) Global
     return [], None, "global"
 
 
+_GEO_SEP = "\x1f"  # non-word char, so \b still holds at every text edge
+
+
+def _batch_hits(ac: Any, parts: List[str], joined: str) -> Iterator[Tuple[int, int, Any]]:
+    """
+    (part_index, end, value) for each automaton hit in joined, which is
+    parts joined by _GEO_SEP.
+
+    Hits arrive in increasing end offset, so the owning part is tracked with
+    a forward pointer instead of a search per hit.
+    """
+    k = 0
+    bound = len(parts[0]) if parts else 0  # offset of the separator after part k
+    for end, value in ac.iter(joined):
+        while end >= bound:
+            k += 1
+            bound += len(parts[k]) + 1
+        yield k, end, value
+
+
+def extract_geo_batch(
+    texts: List[str], lowered: Optional[List[str]] = None
+) -> List[Tuple[List[str], Optional[Tuple[float, float]], str]]:
+    """
+    extract_geo() for many texts at once (`lowered`, if given, is their .lower()).
+
+    The lowered texts are joined with a separator and each automaton scans the
+    buffer once; hits are assigned back to their text by offset. Only texts
+    without an entity hit go through the region/country pass.
+    """
+    texts = [t or "" for t in texts]
+    if lowered is None:
+        lowered = [t.lower() for t in texts]
+    if _GEO_AC is None or _ENTITY_AC is None:
+        return [extract_geo_l(t, tl) for t, tl in zip(texts, lowered)]
+
+    entity_idx: List[Optional[int]] = [None] * len(texts)
+    for k, _, idx in _batch_hits(_ENTITY_AC, lowered, _GEO_SEP.join(lowered)):
+        if entity_idx[k] is None or idx < entity_idx[k]:
+            entity_idx[k] = idx
+
+    rest = [k for k, idx in enumerate(entity_idx) if idx is None]
+    matched: Dict[int, Tuple[Set[int], Set[int]]] = {k: (set(), set()) for k in rest}
+    rest_lowered = [lowered[k] for k in rest]
+    joined = _GEO_SEP.join(rest_lowered)
+    for j, end, (n, targets) in _batch_hits(_GEO_AC, rest_lowered, joined):
+        if _at_boundary(joined, end - n + 1) and _at_boundary(joined, end + 1):
+            m = matched[rest[j]]
+            for layer, idx in targets:
+                m[layer].add(idx)
+    # the few regex-only patterns may use lookarounds, so keep them per text
+    for k in rest:
+        m = matched[k]
+        for layer, patterns in enumerate(_GEO_REGEX_ONLY):
+            for idx, pat in patterns:
+                if idx not in m[layer] and pat.search(texts[k]):
+                    m[layer].add(idx)
+
+    out = []
+    for k, idx in enumerate(entity_idx):
+        if idx is not None:
+            countries, centroid, precision = _resolve_geo(idx, None)
+        else:
+            countries, centroid, precision = _resolve_geo(None, matched[k])
+        out.append((list(countries), centroid, precision))
+    return out
+
+
 # ----------------------------
 # HTTP helper (robust)
 # ----------------------------
 
-_SESSION = requests.Session()
+# Longest Retry-After we honour on 429/503. urllib3 otherwise sleeps for
+# whatever the server asks, and one "Retry-After: 3600" would hold a pool
+# worker (and the whole ingest run) for hours.
+RETRY_AFTER_MAX = 10.0  # seconds
+
+
+class _CappedRetry(Retry):
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_AFTER_MAX)
+
+
+def _build_session() -> requests.Session:
+    """
+    Shared keep-alive session: one connection pool per host, reused by every
+    ingestor and thread. Retries (connect/read errors, 429/5xx) happen inside
+    urllib3 with exponential backoff (0.6s, 1.2s, ...), on pooled sockets;
+    a server's Retry-After is honoured up to RETRY_AFTER_MAX.
+    """
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=_CappedRetry(
+            total=3,
+            backoff_factor=0.6,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,  # hand back the last response; raise_for_status() reports it
+        ),
+    )
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    # Browser-like UA from DEFAULT_HEADERS (some feeds 403 generic bot UAs).
+    s.headers.update(DEFAULT_HEADERS)
+    return s
+
+
+_SESSION = _build_session()
 
-def _backoff(attempt: int) -> float:
-    # 0.6, 1.2, 2.4, ... capped
-    return min(6.0, 0.6 * (2 ** attempt))
 
 def http_get(
     url: str,
@@ -342,35 +692,128 @@ def http_get(
     params: Optional[Dict[str, Any]] = None,
     headers: Optional[Dict[str, str]] = None,
     timeout: Tuple[float, float] = (5, 20),
-    max_retries: int = 3,
 ) -> Optional[requests.Response]:
-    hdrs = dict(DEFAULT_HEADERS)
-    if headers:
-        hdrs.update(headers)
+    """
+    GET via the shared session; headers are merged over DEFAULT_HEADERS.
 
-    last_exc: Optional[Exception] = None
-    for attempt in range(max_retries):
-        try:
-            r = _SESSION.get(url, params=params, headers=hdrs, timeout=timeout)
-            if r.status_code in (403, 451):
-                raise SourceBlocked(f"Blocked by {url} (HTTP {r.status_code})")
-            if r.status_code == 429 or 500 <= r.status_code < 600:
-                time.sleep(_backoff(attempt))
-                continue
-            r.raise_for_status()
-            return r
-        except SourceBlocked:
-            # hard block -> skip source
-            return None
-        except requests.RequestException as e:
-            last_exc = e
-            time.sleep(_backoff(attempt))
-            continue
+    Returns None when the source blocks automated access (403/451) so the
+    caller can skip it. Other HTTP/network errors raise once urllib3 has
+    exhausted its retries.
+    """
+    r = _SESSION.get(url, params=params, headers=headers, timeout=timeout)
+    if r.status_code in (403, 451):
+        # hard block -> skip source
+        return None
+    r.raise_for_status()
+    return r
+
+
+# ----------------------------
+# Conditional GET cache
+# ----------------------------
+# url -> {"etag": str|None, "last_modified": str|None, "digest": str, "events": [...]}
+# A 304, or a 200 whose body hashes to the stored digest, reuses "events"
+# without parsing again (Treasury/OFAC send no validators but rarely change).
 
-    # Exhausted retries
-    if last_exc:
-        raise last_exc
-    return None
+_HTTP_CACHE: Dict[str, Dict[str, Any]] = {}
+_HTTP_CACHE_LOADED = False
+_HTTP_CACHE_LOCK = threading.Lock()
+
+
+def _http_cache_load() -> None:
+    # caller holds _HTTP_CACHE_LOCK
+    global _HTTP_CACHE_LOADED
+    if _HTTP_CACHE_LOADED:
+        return
+    _HTTP_CACHE_LOADED = True
+    try:
+        with open(HTTP_CACHE_PATH, "r", encoding="utf-8") as f:
+            if hasattr(os, "getuid") and os.fstat(f.fileno()).st_uid != os.getuid():
+                return  # not written by us: don't trust its events
+            data = json.load(f)
+        if isinstance(data, dict):
+            _HTTP_CACHE.update(data)
+    except (OSError, ValueError):
+        pass
+
+
+def _http_cache_save() -> None:
+    # caller holds _HTTP_CACHE_LOCK; best-effort, a lost cache only costs a full fetch
+    cache_dir = os.path.dirname(os.path.abspath(HTTP_CACHE_PATH))
+    tmp = None
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        # a private temp file per save: concurrent workers never share one
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".http_cache.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(_HTTP_CACHE, f, ensure_ascii=False)
+        os.replace(tmp, HTTP_CACHE_PATH)
+        tmp = None
+    except OSError:
+        pass
+    finally:
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def conditional_get(
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Tuple[float, float] = (5, 20),
+) -> Tuple[Optional[requests.Response], Optional[List[Dict[str, Any]]]]:
+    """
+    GET with If-None-Match / If-Modified-Since from the cache.
+
+    Returns (response, cached_events):
+      - (None, events) on HTTP 304 or an unchanged body -> reuse the previous parse
+      - (response, None) on a fresh 200 -> parse it, then call cache_parsed()
+      - (None, None) when the source is blocked
+    """
+    with _HTTP_CACHE_LOCK:
+        _http_cache_load()
+        cached = _HTTP_CACHE.get(url)
+
+    hdrs = dict(headers or {})
+    if cached:
+        if cached.get("etag"):
+            hdrs["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            hdrs["If-Modified-Since"] = cached["last_modified"]
+
+    r = http_get(url, headers=hdrs, timeout=timeout)
+    if r is None:
+        return None, None
+    if cached and r.status_code == 304:
+        return None, list(cached.get("events") or [])
+    if cached and cached.get("digest") == _body_digest(r.content):
+        # byte-identical body: keep the parse, just pick up any new validators
+        cache_parsed(url, r, cached.get("events") or [])
+        return None, list(cached.get("events") or [])
+    return r, None
+
+
+def _body_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=8).hexdigest()
+
+
+def cache_parsed(url: str, r: requests.Response, events: List[Dict[str, Any]]) -> None:
+    """Remember validators, body digest and parsed events for url."""
+    entry = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "digest": _body_digest(r.content),
+        "events": events,
+    }
+    with _HTTP_CACHE_LOCK:
+        _http_cache_load()
+        if _HTTP_CACHE.get(url) == entry:
+            return
+        _HTTP_CACHE[url] = entry
+        _http_cache_save()
 
 
 # ----------------------------
@@ -378,78 +821,239 @@ def http_get(
 # ----------------------------
 
 def _id(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()[:18]
+    # Non-cryptographic dedup key; 9-byte BLAKE2b keeps the 18-hex-char width.
+    # Ids are primary keys in the store, so the hash must not depend on which
+    # optional packages are installed (no blake3/xxhash with a fallback).
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=9).hexdigest()
 
 
 def _nowz() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+_RE_TAG = re.compile(r"<[^>]+>")
+
+
+@functools.lru_cache(maxsize=4096)
 def _domain(url: str) -> str:
-    m = re.search(r"https?://([^/]+)/", url or "")
-    return (m.group(1).lower() if m else "")
+    # hostname is already lowercased, with any port/userinfo stripped
+    try:
+        return urlsplit(url or "").hostname or ""
+    except ValueError:  # e.g. malformed IPv6 literal
+        return ""
 
 
-def _quality_from_url(url: str) -> str:
+@functools.lru_cache(maxsize=4096)
+def _url_meta(url: str) -> Tuple[str, str, bool]:
+    """(domain, quality, drop) for url, resolved once per distinct URL."""
     d = _domain(url)
-    return ALLOWLIST_QUALITY.get(d, "OTHER")
+    q = ALLOWLIST_QUALITY.get(d, "OTHER")
+    return d, q, (q == "OTHER") and (d in DOMAIN_BLOCKLIST)
+
+
+def _quality_from_url(url: str) -> str:
+    return _url_meta(url)[1]
 
 
 def _should_drop(url: str) -> bool:
     """Best-effort spam filter. Only drops when the domain is untrusted (OTHER)."""
-    d = _domain(url)
-    q = _quality_from_url(url)
-    return (q == "OTHER") and (d in DOMAIN_BLOCKLIST)
+    return _url_meta(url)[2]
 
 
+@functools.lru_cache(maxsize=4096)
 def _clean_summary(s: str) -> str:
-    s = re.sub(r"<[^>]+>", " ", s or "")
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = s or ""
+    if "<" in s:
+        # Treasury/OFAC titles and most GDELT snippets are already plain text
+        s = _RE_TAG.sub(" ", s)
+    # split/join collapses the same whitespace as re's \s+ and also strips
+    return " ".join(s.split())
+
+
+def _parse_feed(content: bytes) -> Any:
+    # _clean_summary strips markup and the frontend shows plain text, so
+    # feedparser's HTML sanitizer and relative-URI rewriting are wasted work.
+    return feedparser.parse(content, resolve_relative_uris=False, sanitize_html=False)
+
+
+_ATOM_NS = "{http://www.w3.org/2005/Atom}"
+_RSS1_NS = "{http://purl.org/rss/1.0/}"
+_DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+_CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+_FEED_ITEM_TAGS = ("item", f"{_RSS1_NS}item", f"{_ATOM_NS}entry")
+_FEED_MAX_ITEMS = 200
+
+FeedItem = Tuple[str, str, str, str]  # (title, link, summary, published)
+
+
+def _child_text(el: Any, *tags: str) -> str:
+    for tag in tags:
+        child = el.find(tag)
+        if child is not None:
+            # itertext() also covers Atom type="xhtml" bodies nested as elements.
+            return "".join(child.itertext()).strip()
+    return ""
+
+
+def _atom_link(el: Any) -> str:
+    for link in el.iterfind(f"{_ATOM_NS}link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href").strip()
+    return ""
+
+
+def _feed_item(el: Any) -> FeedItem:
+    tag = el.tag
+    if tag == f"{_ATOM_NS}entry":
+        return (
+            _child_text(el, f"{_ATOM_NS}title"),
+            _atom_link(el),
+            _child_text(el, f"{_ATOM_NS}summary", f"{_ATOM_NS}content"),
+            _child_text(el, f"{_ATOM_NS}published", _DC_DATE),
+        )
+    ns = _RSS1_NS if tag == f"{_RSS1_NS}item" else ""
+    link = _child_text(el, f"{ns}link")
+    if not link:
+        guid = el.find("guid")
+        if guid is not None and guid.get("isPermaLink", "true") != "false":
+            link = (guid.text or "").strip()
+    return (
+        _child_text(el, f"{ns}title"),
+        link,
+        # body-only items (no/empty description) summarise from content:encoded, as feedparser did
+        _child_text(el, f"{ns}description") or _child_text(el, _CONTENT_ENCODED),
+        _child_text(el, "pubDate", _DC_DATE),
+    )
 
 
-def _is_copper(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in COPPER_KW)
+def _iter_feed_xml(content: bytes, max_items: int) -> Iterator[FeedItem]:
+    ctx = etree.iterparse(
+        BytesIO(content),
+        events=("end",),
+        tag=_FEED_ITEM_TAGS,
+        resolve_entities=False,
+        no_network=True,
+    )
+    for n, (_, el) in enumerate(ctx):
+        if n >= max_items:
+            break
+        yield _feed_item(el)
+        # Only the current item is needed; drop it and earlier siblings so
+        # memory stays flat however long the feed is.
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+
+def _parse_rss_items(content: bytes, *, strict: bool = True, max_items: int = _FEED_MAX_ITEMS) -> Optional[List[FeedItem]]:
+    """
+    First `max_items` feed entries as (title, link, summary, published).
 
+    RSS 2.0, RSS 1.0 and Atom are streamed with lxml. Feeds that aren't
+    well-formed XML fall back to feedparser's lenient parser; with `strict`
+    a feed that feedparser also flags as malformed returns None.
+    """
+    try:
+        return list(_iter_feed_xml(content, max_items))
+    except etree.XMLSyntaxError:
+        pass
 
-def _risk_types(text: str) -> List[str]:
-    t = (text or "").lower()
-    out: List[str] = []
-    for risk, kws in RISK_KW.items():
-        if any(kw in t for kw in kws):
-            out.append(risk)
-    return out or ["other"]
+    feed = _parse_feed(content)
+    if strict and getattr(feed, "bozo", False):
+        return None
+    return [
+        (
+            getattr(e, "title", "") or "",
+            getattr(e, "link", "") or "",
+            (e.get("summary_detail") or {}).get("value", "") or "",
+            getattr(e, "published", "") or "",
+        )
+        for e in (getattr(feed, "entries", []) or [])[:max_items]
+    ]
 
 
-WHY_IT_MATTERS = {
-    "policy": "Potential policy/regulatory change that can affect permitting, exports, taxes, or investment conditions.",
-    "logistics": "Potential disruption to transport/ports/shipping that can delay concentrates/cathodes and tighten supply.",
-    "labor": "Labor action risk (strike/protest) that can reduce mine/smelter throughput and impact TCRCs/availability.",
-    "conflict": "Conflict/security risk that can disrupt operations, infrastructure, or trade routes.",
-    "sanctions": "Sanctions/designations risk that can affect counterparties, payments, shipping, and trade compliance.",
-    "other": "Potential market-moving development; verify details and linkage to the copper supply chain.",
-}
+# ----------------------------
+# Keyword classification
+# ----------------------------
+# Flattened once at import: every copper/risk/severity keyword maps to a
+# bitmask of the categories it signals (bit 0 copper, then one bit per risk,
+# then one per severity tier). Shared keywords such as "ban" or "sanction"
+# are scanned once, and one pass ORs together the mask for the whole text.
+
+_COPPER_BIT = 1
+_RISK_BITS: List[Tuple[str, int]] = [(risk, 1 << (1 + i)) for i, risk in enumerate(RISK_KW)]
+_SEV_BITS: List[Tuple[int, int]] = [
+    (bonus, 1 << (1 + len(RISK_KW) + tier)) for tier, (bonus, _) in enumerate(SEVERITY_TIERS)
+]
+# copper or any known risk -> worth keeping even without copper keywords
+_FORCE_MASK = _COPPER_BIT | sum(bit for _, bit in _RISK_BITS)
 
 
-def _why_it_matters(risks: List[str]) -> str:
-    r = (risks[0] if risks else "other")
-    return WHY_IT_MATTERS.get(r, WHY_IT_MATTERS["other"])
+def _build_keyword_masks() -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for kw in COPPER_KW:
+        masks[kw] = masks.get(kw, 0) | _COPPER_BIT
+    for (risk, bit) in _RISK_BITS:
+        for kw in RISK_KW[risk]:
+            masks[kw] = masks.get(kw, 0) | bit
+    for (_, bit), (_, kws) in zip(_SEV_BITS, SEVERITY_TIERS):
+        for kw in kws:
+            masks[kw] = masks.get(kw, 0) | bit
+    return masks
 
 
-def _severity(text: str, risks: List[str]) -> int:
+def _build_keyword_automaton(kw_masks: Dict[str, int]):
+    if ahocorasick is None:
+        return None
+    ac = ahocorasick.Automaton()
+    for kw, mask in kw_masks.items():
+        ac.add_word(kw, mask)
+    ac.make_automaton()
+    return ac
+
+
+_KW_MASKS = _build_keyword_masks()
+_KW_AC = _build_keyword_automaton(_KW_MASKS)
+_ALL_MASK = functools.reduce(lambda a, b: a | b, _KW_MASKS.values(), 0)
+# shorter text cannot contain any keyword (e.g. empty Treasury summaries)
+_MIN_KW_LEN = min(len(kw) for kw in _KW_MASKS)
+
+
+def _keyword_mask(text: str) -> int:
+    """Category bits of every keyword occurring in text (substring semantics, one pass)."""
+    return _keyword_mask_l((text or "").lower())
+
+
+@functools.lru_cache(maxsize=4096)
+def _keyword_mask_l(t: str) -> int:
+    """_keyword_mask for text the caller has already lowercased (memoized per run)."""
+    if len(t) < _MIN_KW_LEN:
+        return 0
+    mask = 0
+    matches = _KW_AC.iter(t) if _KW_AC is not None else (
+        (None, m) for kw, m in _KW_MASKS.items() if kw in t
+    )
+    for _, m in matches:
+        mask |= m
+        if mask == _ALL_MASK:
+            break  # every category already matched; rest of the text can't change the result
+    return mask
+
+
+def _risks_from_mask(mask: int) -> List[str]:
+    return [risk for risk, bit in _RISK_BITS if mask & bit] or ["other"]
+
+
+def _severity_from_mask(mask: int, risks: List[str]) -> int:
     """
     Simple heuristic severity score 0-100.
     """
-    t = (text or "").lower()
     score = 25
 
-    if any(x in t for x in ["shutdown", "collapse", "ban", "embargo"]):
-        score += 40
-    elif any(x in t for x in ["strike", "blockade", "attack", "sanction", "halt"]):
-        score += 25
-    elif any(x in t for x in ["delay", "protest", "tighten", "restriction"]):
-        score += 10
+    for bonus, bit in _SEV_BITS:
+        if mask & bit:
+            score += bonus
+            break
 
     if "sanctions" in risks or "conflict" in risks:
         score += 10
@@ -461,13 +1065,85 @@ def _severity(text: str, risks: List[str]) -> int:
     return max(0, min(100, score))
 
 
+def _is_copper(text: str) -> bool:
+    return bool(_keyword_mask(text) & _COPPER_BIT)
+
+
+def _risk_types(text: str) -> List[str]:
+    return _risks_from_mask(_keyword_mask(text))
+
+
+def _severity(text: str, risks: List[str]) -> int:
+    return _severity_from_mask(_keyword_mask(text), risks)
+
+
+WHY_IT_MATTERS = {
+    "policy": "Potential policy/regulatory change that can affect permitting, exports, taxes, or investment conditions.",
+    "logistics": "Potential disruption to transport/ports/shipping that can delay concentrates/cathodes and tighten supply.",
+    "labor": "Labor action risk (strike/protest) that can reduce mine/smelter throughput and impact TCRCs/availability.",
+    "conflict": "Conflict/security risk that can disrupt operations, infrastructure, or trade routes.",
+    "sanctions": "Sanctions/designations risk that can affect counterparties, payments, shipping, and trade compliance.",
+    "other": "Potential market-moving development; verify details and linkage to the copper supply chain.",
+}
+
+
+# Every risk _risks_from_mask can emit, resolved once so lookups can't miss.
+_WHY_BY_RISK: Dict[str, str] = {
+    r: WHY_IT_MATTERS.get(r, WHY_IT_MATTERS["other"]) for r in (*RISK_KW, "other")
+}
+
+
+def _why_it_matters(risks: List[str]) -> str:
+    return _WHY_BY_RISK[risks[0] if risks else "other"]
+
+
+# Only 2^5 risk combinations exist (plus "other"), so build each tag list once.
+# Shared between events: treat as read-only.
+@functools.lru_cache(maxsize=64)
+def _tags_for(risks: Tuple[str, ...]) -> List[str]:
+    return sorted({*(r.upper() for r in risks), "COPPER"})
+
+
 def _parse_dt_to_z(dt_str: str) -> str:
     if not dt_str:
         return _nowz()
+    return _parse_dt_cached(dt_str) or _nowz()
+
+
+# strptime fast paths for the shapes feeds actually send (no fractional
+# seconds, so strftime output matches dateutil + isoformat exactly); anything
+# else falls through to dateutil. %z also accepts "Z" and "+HH:MM".
+_DT_ISO_FORMATS = (
+    "%Y%m%dT%H%M%SZ",  # GDELT seendate
+    "%Y-%m-%dT%H:%M:%S%z",  # Atom / ISO-8601
+)
+_DT_RFC822_FORMATS = (
+    "%a, %d %b %Y %H:%M:%S %z",  # RSS pubDate
+    "%a, %d %b %Y %H:%M:%S GMT",
+)
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_dt_cached(dt_str: str) -> Optional[str]:
+    # Feeds repeat timestamps a lot and dateutil is slow. Unparseable input
+    # returns None so the "now" fallback is never frozen into the cache.
+    fmts = _DT_ISO_FORMATS if dt_str[:1].isdigit() else _DT_RFC822_FORMATS
+    for fmt in fmts:
+        try:
+            dt = datetime.strptime(dt_str, fmt)
+        except ValueError:
+            continue
+        if dt.tzinfo is None:  # literal GMT / Z in the format
+            return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     try:
         return dtparse.parse(dt_str).astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
     except Exception:
-        return _nowz()
+        return None
+
+
+# (event without its geo fields, text to geocode, text.lower())
+EventDraft = Tuple[Dict[str, Any], str, str]
 
 
 def _mk_event(
@@ -482,23 +1158,86 @@ def _mk_event(
     """
     Build a normalized event matching the frontend schema.
     """
-    if _should_drop(url):
+    draft = _event_draft(title, summary, url, source_name, published_at, force_include)
+    if draft is None:
         return None
+    _, text, tl = draft
+    return _finish_event(draft, extract_geo_l(text, tl), location)
+
+
+def _mk_events(drafts: List[EventDraft]) -> List[Dict[str, Any]]:
+    """Finish a source's drafts, geocoding them in one extract_geo_batch pass."""
+    geos = extract_geo_batch([d[1] for d in drafts], [d[2] for d in drafts])
+    return [_finish_event(d, g) for d, g in zip(drafts, geos)]
 
-    summary = _clean_summary(summary)
+
+def _event_draft(
+    title: str,
+    summary: str,
+    url: str,
+    source_name: str,
+    published_at: str,
+    force_include: bool = False,
+) -> Optional[EventDraft]:
+    """Filter and classify one item; None if it isn't an event."""
+    _, quality, drop = _url_meta(url)
+    if drop:
+        return None
+
+    # Most GDELT/Mining items are not copper-relevant: reject them on the raw
+    # text before paying for summary cleaning, but only when cleaning would
+    # leave the summary unchanged. Cleaning turns tags and newlines into single
+    # spaces (and fills an empty summary from the title), which can complete a
+    # space-delimited keyword such as " cu " that the raw text lacks.
+    # The lowered text is computed once and shared by the keyword and geo scans.
+    raw_summary = summary or ""
+    mask: Optional[int] = None
+    tl = ""
+    if not force_include and raw_summary and "<" not in raw_summary and " ".join(raw_summary.split()) == raw_summary:
+        tl = f"{title} {raw_summary}".lower()
+        mask = _keyword_mask_l(tl)
+        if not (mask & _COPPER_BIT):
+            return None
+
+    summary = _clean_summary(raw_summary)
     if not summary and title:
         summary = " ".join(title.split()[:28])
 
     text = f"{title} {summary}"
+    if mask is None or summary != raw_summary:
+        # classify what the frontend will actually show
+        tl = text.lower()
+        mask = _keyword_mask_l(tl)
+        if (not force_include) and not (mask & _COPPER_BIT):
+            return None
 
-    if (not force_include) and (not _is_copper(text)):
-        return None
-
-    risks = _risk_types(text)
-    sev = _severity(text, risks)
+    risks = _risks_from_mask(mask)
+    sev = _severity_from_mask(mask, risks)
     why = _why_it_matters(risks)
 
-    countries, centroid, precision = extract_geo(text)
+    ev = {
+        "id": _id(url + "|" + title),
+        "title": (title or "")[:500],
+        "summary": (summary or "")[:240],
+        "whyItMatters": why,
+        "sourceUrl": url,
+        "sourceName": source_name,
+        "sourceQuality": quality,
+        "publishedAt": _parse_dt_to_z(published_at),
+        "materials": ["Copper"],
+        "riskType": risks,
+        "severity": sev,
+    }
+    return ev, text, tl
+
+
+def _finish_event(
+    draft: EventDraft,
+    geo: Tuple[List[str], Optional[Tuple[float, float]], str],
+    location: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    ev = draft[0]
+    countries, centroid, precision = geo
 
     # Location precedence:
     # 1) explicit location passed in from ingestor
@@ -517,343 +1256,364 @@ def _mk_event(
     else:
         loc = {"name": "Global", "lat": 0.0, "lon": 0.0, "precision": "global"}
 
-    return {
-        "id": _id(url + "|" + title),
-        "title": (title or "")[:500],
-        "summary": (summary or "")[:240],
-        "whyItMatters": why,
-        "sourceUrl": url,
-        "sourceName": source_name,
-        "sourceQuality": _quality_from_url(url),
-        "publishedAt": _parse_dt_to_z(published_at),
-        "materials": ["Copper"],
-        "riskType": risks,
-        "severity": sev,
-        "countries": countries or (["GLOBAL"] if loc["precision"] == "global" else []),
-        "location": loc,
-        "tags": sorted(list({*(r.upper() for r in risks), "COPPER"})),
-    }
+    ev["countries"] = countries or (["GLOBAL"] if loc["precision"] == "global" else [])
+    ev["location"] = loc
+    ev["tags"] = _tags_for(tuple(ev["riskType"]))
+    return ev
 
 
 # ----------------------------
 # Source ingestors
 # ----------------------------
 
-def ingest_mining_rss() -> List[Dict[str, Any]]:
-    """
-    Mining.com RSS.
-
-    Mining.com frequently changes RSS endpoints, and some endpoints can return 403 to non-browser user agents.
-    This ingestor:
-    - Tries multiple candidate feed URLs
-    - Uses a browser-like User-Agent
-    - Never crashes ingestion if Mining.com blocks us
-    """
+_RSS_ACCEPT = {"Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8"}
 
-    FEED_URLS = [
-        "https://www.mining.com/feed/",
-        "https://www.mining.com/?feed=rss2",
-        "https://mining.com/feed/",
-        "https://mining.com/?feed=rss2",
-    ]
 
-    headers = {
-        "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
-    }
+def _ingest_rss(
+    feed_urls: List[str],
+    source_name: str,
+    *,
+    force_include: bool = False,
+    max_items: int = _FEED_MAX_ITEMS,
+    mirrors: bool = False,
+    strict: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Shared RSS/Atom ingestion: conditional GET, streaming parse, batched event build.
 
+    By default feed_urls are separate feeds and their events are concatenated;
+    a failing feed is skipped unless every feed fails. With mirrors=True they
+    are alternative endpoints for one feed: the first that yields items wins,
+    and a block (403/451) stops the search. `strict` is passed to
+    _parse_rss_items.
+    """
+    out: List[Dict[str, Any]] = []
     last_err: Exception | None = None
+    failed = 0
 
-    for feed_url in FEED_URLS:
+    for feed_url in feed_urls:
         try:
-            r = http_get(feed_url, headers=headers, timeout=(5, 20))
+            r, cached = conditional_get(feed_url, headers=_RSS_ACCEPT, timeout=(5, 20))
+            if cached is not None:
+                if mirrors:
+                    return cached
+                out.extend(cached)
+                continue
             if r is None:
                 # blocked
-                return []
-            feed = feedparser.parse(r.content)
-            if getattr(feed, "bozo", False):
+                if mirrors:
+                    return []
                 continue
-            entries = getattr(feed, "entries", []) or []
-            if not entries:
+            items = _parse_rss_items(r.content, strict=strict, max_items=max_items)
+            if items is None or (mirrors and not items):
                 continue
 
-            out: List[Dict[str, Any]] = []
-            for e in entries[:200]:
-                title = getattr(e, "title", "") or ""
-                url = getattr(e, "link", "") or ""
-                summary = getattr(e, "summary", "") or ""
-                published = getattr(e, "published", "") or ""
-                ev = _mk_event(title, summary, url, "Mining.com", published)
-                if ev:
-                    out.append(ev)
-            return out
+            drafts = [
+                _event_draft(title, summary, url, source_name, published, force_include=force_include)
+                for title, url, summary, published in items
+            ]
+            feed_events = _mk_events([d for d in drafts if d])
+            cache_parsed(feed_url, r, feed_events)
+            if mirrors:
+                return feed_events
+            out.extend(feed_events)
         except Exception as e:
             last_err = e
+            failed += 1
             continue
 
-    if last_err:
+    # mirrors only get here if none of them produced the feed
+    if last_err and (mirrors or failed == len(feed_urls)):
         raise last_err
-    return []
-
+    return out
 
-def ingest_gdelt(days: int = 7) -> List[Dict[str, Any]]:
-    q = (
-        "copper AND ("
-        "mine OR mining OR smelter OR refinery OR concentrate OR cathode OR "
-        "export OR import OR tariff OR quota OR strike OR protest OR "
-        "sanction OR embargo OR port OR shipping OR canal OR blockade OR "
-        "royalty OR regulation OR law"
-        ")"
-    )
 
-    url = "https://api.gdeltproject.org/api/v2/doc/doc"
-    params = {
-        "query": q,
-        "mode": "ArtList",
-        "format": "json",
-        "maxrecords": 100,
-        "timespan": f"{days}d",
-        "sort": "DateDesc",
-    }
+def ingest_mining_rss() -> List[Dict[str, Any]]:
+    """
+    Mining.com RSS.
 
-    r = http_get(url, params=params, headers={"Accept": "application/json"})
+    Mining.com frequently changes RSS endpoints, and some endpoints can return 403 to non-browser user agents.
+    This ingestor:
+    - Tries multiple candidate feed URLs
+    - Uses a browser-like User-Agent
+    - Never crashes ingestion if Mining.com blocks us
+    """
+    FEED_URLS = [
+        "https://www.mining.com/feed/",
+        "https://www.mining.com/?feed=rss2",
+        "https://mining.com/feed/",
+        "https://mining.com/?feed=rss2",
+    ]
+    return _ingest_rss(FEED_URLS, "Mining.com", mirrors=True)
+
+
+_GDELT_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
+_GDELT_BASE_Q = (
+    "copper AND ("
+    "mine OR mining OR smelter OR refinery OR concentrate OR cathode OR "
+    "export OR import OR tariff OR quota OR strike OR protest OR "
+    "sanction OR embargo OR port OR shipping OR canal OR blockade OR "
+    "royalty OR regulation OR law"
+    ")"
+)
+# quote_plus works per character, so encoded prefixes can be concatenated
+# onto this instead of re-encoding the whole keyword expression per call.
+_GDELT_BASE_Q_ENC = quote_plus(_GDELT_BASE_Q)
+
+
+def _gdelt_articles(query_enc: str, days: int) -> List[Dict[str, Any]]:
+    url = (
+        f"{_GDELT_URL}?query={query_enc}&mode=ArtList&format=json"
+        f"&maxrecords=100&timespan={days}d&sort=DateDesc"
+    )
+    r = http_get(url, headers={"Accept": "application/json"})
     if r is None:
         return []
-    js = r.json()
+    js = json_loads(r.content)
     if js.get("status") == "error":
         raise RuntimeError(f"GDELT error: {js.get('message') or js}")
+    return js.get("articles") or []
 
-    articles = js.get("articles") or []
-    if not articles:
-        return []
 
-    out: List[Dict[str, Any]] = []
+def _gdelt_events(
+    articles: List[Dict[str, Any]],
+    source_label: Optional[str] = None,
+    domain_labels: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    drafts: List[EventDraft] = []
     for a in articles[:100]:
         title = a.get("title") or ""
         url0 = a.get("url") or ""
         summary = a.get("snippet") or ""
         seen = a.get("seendate") or _nowz()
-        source = a.get("domain") or "GDELT"
-        ev = _mk_event(title, summary, url0, source, seen)
-        if ev:
-            out.append(ev)
+        domain = a.get("domain")
+        source = source_label
+        if not source and domain_labels and domain:
+            d = domain.lower()
+            source = domain_labels.get(d[4:] if d.startswith("www.") else d)
+        source = source or domain or "GDELT"
+        d = _event_draft(title, summary, url0, source, seen)
+        if d:
+            drafts.append(d)
+    return _mk_events(drafts)
 
-    return out
+
+def ingest_gdelt(days: int = 7) -> List[Dict[str, Any]]:
+    return _gdelt_events(_gdelt_articles(_GDELT_BASE_Q_ENC, days))
 
 
 def ingest_gdelt_domain(days: int, domain: str, source_label: str) -> List[Dict[str, Any]]:
-    q = (
-        f"domain:{domain} AND copper AND ("
-        "mine OR mining OR smelter OR refinery OR concentrate OR cathode OR "
-        "export OR import OR tariff OR quota OR strike OR protest OR "
-        "sanction OR embargo OR port OR shipping OR canal OR blockade OR "
-        "royalty OR regulation OR law"
-        ")"
-    )
+    query_enc = quote_plus(f"domain:{domain} AND ") + _GDELT_BASE_Q_ENC
+    return _gdelt_events(_gdelt_articles(query_enc, days), source_label)
 
-    url = "https://api.gdeltproject.org/api/v2/doc/doc"
-    params = {
-        "query": q,
-        "mode": "ArtList",
-        "format": "json",
-        "maxrecords": 100,
-        "timespan": f"{days}d",
-        "sort": "DateDesc",
-    }
 
-    r = http_get(url, params=params, headers={"Accept": "application/json"})
-    if r is None:
+def ingest_gdelt_domains(days: int, domains: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    One GDELT query restricted to several publisher domains (OR'd together),
+    instead of a round trip per domain. Each article is labelled from
+    GDELT_DOMAIN_LABELS by its own domain.
+    """
+    domains = list(GDELT_DOMAIN_LABELS) if domains is None else domains
+    if not domains:
         return []
-    js = r.json()
-    if js.get("status") == "error":
-        raise RuntimeError(f"GDELT error: {js.get('message') or js}")
+    clause = " OR ".join(f"domain:{d}" for d in domains)
+    if len(domains) > 1:
+        # GDELT only accepts parentheses around OR'd terms
+        clause = f"({clause})"
+    query_enc = quote_plus(f"{clause} AND ") + _GDELT_BASE_Q_ENC
+    return _gdelt_events(_gdelt_articles(query_enc, days), domain_labels=GDELT_DOMAIN_LABELS)
 
-    articles = js.get("articles") or []
-    if not articles:
-        return []
 
-    out: List[Dict[str, Any]] = []
-    for a in articles[:100]:
-        title = a.get("title") or ""
-        url0 = a.get("url") or ""
-        summary = a.get("snippet") or ""
-        seen = a.get("seendate") or _nowz()
-        ev = _mk_event(title, summary, url0, source_label, seen)
-        if ev:
-            out.append(ev)
+_HTML_CHUNK = 64 * 1024
 
-    return out
+
+def _iter_links(r: requests.Response, href_part: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream-parse an HTML listing page and yield (href, text) for every <a>
+    whose href contains href_part, in document order.
+
+    lxml only reports <a> end events (tag filter), so Python never touches the
+    rest of the markup. After each chunk, everything before the last link is
+    dropped so even link-heavy pages keep a small tree.
+    """
+    # decode with the same charset r.text would use
+    parser = etree.HTMLPullParser(events=("end",), tag="a", encoding=r.encoding or r.apparent_encoding)
+    content = r.content
+
+    def drain() -> Iterator[Tuple[str, str]]:
+        last = None
+        for _, a in parser.read_events():
+            href = a.get("href", "")
+            if href_part in href:
+                yield href, _link_text(a)
+            last = a
+        if last is not None and next(last.iterancestors("a"), None) is None:
+            _drop_preceding(last)
+
+    for i in range(0, len(content), _HTML_CHUNK):
+        parser.feed(content[i:i + _HTML_CHUNK])
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+def _drop_preceding(el: Any) -> None:
+    """Free el's contents and everything before it in document order."""
+    el.clear(keep_tail=True)
+    while el is not None:
+        parent = el.getparent()
+        if parent is not None:
+            while el.getprevious() is not None:
+                del parent[0]
+        el = parent
+
+
+def _link_text(a: Any) -> str:
+    # same joining as BeautifulSoup's get_text(" ", strip=True)
+    return " ".join(p.strip() for p in a.itertext() if p.strip())
 
 
 def scrape_treasury_press_releases() -> List[Dict[str, Any]]:
     url = "https://home.treasury.gov/news/press-releases"
-    r = http_get(url, timeout=(5, 20))
+    r, cached = conditional_get(url, timeout=(5, 20))
+    if cached is not None:
+        return cached
     if r is None:
         return []
 
-    soup = BeautifulSoup(r.text, "lxml")
-    out: List[Dict[str, Any]] = []
+    drafts: List[EventDraft] = []
 
-    for a in soup.select("a[href]"):
-        href = a.get("href", "")
-        text = a.get_text(" ", strip=True)
-        if not text:
-            continue
-        if "/news/press-releases/" in href and len(text) > 15:
+    for href, text in _iter_links(r, "/news/press-releases/"):
+        if len(drafts) >= 80:
+            break
+        if len(text) > 15:
             full = href if href.startswith("http") else "https://home.treasury.gov" + href
-            risks = _risk_types(text)
-            force = (risks != ["other"]) or _is_copper(text)
-            ev = _mk_event(text, "", full, "U.S. Treasury", _nowz(), force_include=force)
-            if ev:
-                out.append(ev)
+            force = bool(_keyword_mask(text) & _FORCE_MASK)
+            d = _event_draft(text, "", full, "U.S. Treasury", _nowz(), force_include=force)
+            if d:
+                drafts.append(d)
 
-    return out[:80]
+    out = _mk_events(drafts)
+    cache_parsed(url, r, out)
+    return out
 
 
 def scrape_ofac_recent_actions() -> List[Dict[str, Any]]:
     url = "https://ofac.treasury.gov/recent-actions"
-    r = http_get(url, timeout=(5, 15))
+    r, cached = conditional_get(url, timeout=(5, 15))
+    if cached is not None:
+        return cached
     if r is None:
         return []
 
-    soup = BeautifulSoup(r.text, "lxml")
-    out: List[Dict[str, Any]] = []
+    drafts: List[EventDraft] = []
 
-    for a in soup.select("a[href]"):
-        href = a.get("href", "")
-        text = a.get_text(" ", strip=True)
-        if not text or len(text) <= 12:
-            continue
-        if "/recent-actions/" in href:
+    for href, text in _iter_links(r, "/recent-actions/"):
+        if len(drafts) >= 80:
+            break
+        if len(text) > 12:
             full = href if href.startswith("http") else "https://ofac.treasury.gov" + href
-            ev = _mk_event(text, "", full, "OFAC", _nowz(), force_include=True)
-            if ev:
-                out.append(ev)
+            d = _event_draft(text, "", full, "OFAC", _nowz(), force_include=True)
+            if d:
+                drafts.append(d)
 
-    return out[:80]
+    out = _mk_events(drafts)
+    cache_parsed(url, r, out)
+    return out
 
 
 def ingest_state_rss() -> List[Dict[str, Any]]:
     if not STATE_DEPT_FEEDS:
         return []
-
-    out: List[Dict[str, Any]] = []
-    for feed_url in STATE_DEPT_FEEDS:
-        try:
-            r = http_get(feed_url, headers={"Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8"})
-            if r is None:
-                continue
-            feed = feedparser.parse(r.content)
-            for e in getattr(feed, "entries", [])[:200]:
-                title = getattr(e, "title", "") or ""
-                url = getattr(e, "link", "") or ""
-                summary = getattr(e, "summary", "") or ""
-                published = getattr(e, "published", "") or ""
-                ev = _mk_event(title, summary, url, "U.S. State Dept", published)
-                if ev:
-                    out.append(ev)
-        except Exception:
-            continue
-    return out
+    return _ingest_rss(STATE_DEPT_FEEDS, "U.S. State Dept", strict=False)
 
 
 def ingest_eu_consilium_press_releases_rss() -> List[Dict[str, Any]]:
-    feed_url = "https://www.consilium.europa.eu/en/rss/pressreleases.ashx"
-    r = http_get(feed_url, headers={"Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8"})
-    if r is None:
-        return []
-
-    feed = feedparser.parse(r.content)
-    if getattr(feed, "bozo", False):
-        return []
-
-    out: List[Dict[str, Any]] = []
-    for e in getattr(feed, "entries", [])[:200]:
-        title = getattr(e, "title", "") or ""
-        url = getattr(e, "link", "") or ""
-        summary = getattr(e, "summary", "") or ""
-        published = getattr(e, "published", "") or ""
-        ev = _mk_event(title, summary, url, "EU Council", published, force_include=True)
-        if ev:
-            out.append(ev)
-    return out
+    return _ingest_rss(
+        ["https://www.consilium.europa.eu/en/rss/pressreleases.ashx"], "EU Council", force_include=True
+    )
 
 
 def ingest_uk_ofsi_blog_feed() -> List[Dict[str, Any]]:
-    feed_url = "https://ofsi.blog.gov.uk/feed/"
-    r = http_get(feed_url, headers={"Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8"})
-    if r is None:
-        return []
-
-    feed = feedparser.parse(r.content)
-    if getattr(feed, "bozo", False):
-        return []
-
-    out: List[Dict[str, Any]] = []
-    for e in getattr(feed, "entries", [])[:200]:
-        title = getattr(e, "title", "") or ""
-        url = getattr(e, "link", "") or ""
-        summary = getattr(e, "summary", "") or ""
-        published = getattr(e, "published", "") or ""
-        ev = _mk_event(title, summary, url, "UK OFSI", published, force_include=True)
-        if ev:
-            out.append(ev)
-    return out
+    return _ingest_rss(["https://ofsi.blog.gov.uk/feed/"], "UK OFSI", force_include=True)
 
 
 # ----------------------------
 # Master run
 # ----------------------------
 
-def run_all(days: int = 7) -> List[Dict[str, Any]]:
+def _clear_text_caches() -> None:
+    """Drop memoized per-text analysis so memory stays bounded to one run."""
+    for fn in (_keyword_mask_l, _extract_geo_cached, _clean_summary):
+        fn.cache_clear()
+
+
+def _published_key(e: Dict[str, Any]) -> str:
+    # publishedAt is normalized to UTC ISO-8601 ("...Z"), so text order is time order
+    return e.get("publishedAt", "")
+
+
+def run_all(days: int = 7, top: Optional[int] = None) -> List[Dict[str, Any]]:
     """
-    Run all enabled sources and return merged events.
+    Run all enabled sources and return merged events, newest first.
+    With `top`, only the `top` most recent events are returned.
     Attaches run_all.last_report for debugging.
     """
+    # Priority order (official -> major media -> industry -> discovery): when two
+    # sources yield the same event id, the first one listed wins.
     sources: List[Tuple[str, Callable[[], List[Dict[str, Any]]]]] = [
-        ("GDELT", lambda: ingest_gdelt(days=days)),
-        ("Mining.com RSS", ingest_mining_rss),
         ("U.S. Treasury", scrape_treasury_press_releases),
         ("OFAC", scrape_ofac_recent_actions),
         ("EU Council", ingest_eu_consilium_press_releases_rss),
         ("UK OFSI", ingest_uk_ofsi_blog_feed),
         ("U.S. State Dept", ingest_state_rss),
-        ("Reuters via GDELT", lambda: ingest_gdelt_domain(days=days, domain="reuters.com", source_label="Reuters")),
+        ("Publishers via GDELT", lambda: ingest_gdelt_domains(days=days)),
+        ("Mining.com RSS", ingest_mining_rss),
+        ("GDELT", lambda: ingest_gdelt(days=days)),
     ]
 
-    merged: Dict[str, Dict[str, Any]] = {}
-    report: List[Dict[str, Any]] = []
+    _clear_text_caches()
 
-    for name, fn in sources:
+    def _run_source(name: str, fn: Callable[[], List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         t0 = time.time()
         try:
             events = fn() or []
-            for e in events:
-                merged[e["id"]] = e
-
-            status = "ok" if events else "empty"
-            report.append({
-                "source": name,
-                "status": status,
-                "events": len(events),
-                "error": None,
-                "duration_ms": int((time.time() - t0) * 1000),
-            })
+            status, error = ("ok" if events else "empty"), None
         except SourceBlocked as e:
-            report.append({
-                "source": name,
-                "status": "blocked",
-                "events": 0,
-                "error": str(e),
-                "duration_ms": int((time.time() - t0) * 1000),
-            })
+            events, status, error = [], "blocked", str(e)
         except Exception as e:
-            report.append({
-                "source": name,
-                "status": "error",
-                "events": 0,
-                "error": str(e),
-                "duration_ms": int((time.time() - t0) * 1000),
-            })
+            events, status, error = [], "error", str(e)
+        return events, {
+            "source": name,
+            "status": status,
+            "events": len(events),
+            "error": error,
+            "duration_ms": int((time.time() - t0) * 1000),
+        }
+
+    # Sources are independent network I/O, so fan them out; results are
+    # merged back in list order so dedup and the report stay deterministic.
+    results: List[Tuple[List[Dict[str, Any]], Dict[str, Any]]] = [([], {})] * len(sources)
+    with ThreadPoolExecutor(max_workers=min(INGEST_MAX_WORKERS, len(sources)), thread_name_prefix="ingest") as ex:
+        futures = {ex.submit(_run_source, name, fn): i for i, (name, fn) in enumerate(sources)}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+
+    seen: Set[str] = set()
+    merged: List[Dict[str, Any]] = []
+    report: List[Dict[str, Any]] = []
+    for events, entry in results:
+        for e in events:
+            eid = e["id"]
+            if eid in seen:
+                continue
+            seen.add(eid)
+            merged.append(e)
+        report.append(entry)
 
     run_all.last_report = report  # type: ignore[attr-defined]
-    return sorted(list(merged.values()), key=lambda x: x.get("publishedAt", ""), reverse=True)
+    # both are stable: equal timestamps keep source priority order
+    if top is not None and top < len(merged):
+        return heapq.nlargest(top, merged, key=_published_key)
+    merged.sort(key=_published_key, reverse=True)
+    return merged
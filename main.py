@@ -1,13 +1,98 @@
+import asyncio
+import hashlib
+import os
+import time
 import traceback
-from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Header, Query, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from store import init_db, upsert_events, query_events
+from store import init_db, close_db, upsert_events, query_event_fields, query_event_payloads, json_dumps, json_loads
 from ingest import run_all
 
-app = FastAPI(title="Geo Monitor API")
+try:  # optional: only needed for /events?format=msgpack (pip install msgpack)
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+# Field order of the columnar /events layouts (format=compact|msgpack)
+EVENT_COLUMNS = (
+    "id", "title", "summary", "whyItMatters", "sourceUrl", "sourceName", "sourceQuality",
+    "publishedAt", "materials", "riskType", "severity", "countries", "location", "tags",
+)
+_EVENTS_MEDIA_TYPES = {"json": "application/json", "compact": "application/json", "msgpack": "application/msgpack"}
+
+
+# ----------------------------
+# /events response cache
+# ----------------------------
+# Results only change when an ingest lands, so identical filter tuples are
+# answered from memory (body + ETag) for a short TTL. Every cache access runs
+# on the event loop with no await in between, so no lock is needed; the
+# generation counter keeps a query that started before an ingest from
+# re-populating the cache with pre-ingest results.
+EVENTS_CACHE_TTL = float(os.environ.get("GEO_EVENTS_CACHE_TTL", "60"))  # seconds; 0 disables
+EVENTS_CACHE_SIZE = 512
+EVENTS_CACHE_CONTROL = "public, max-age=30"  # lets browsers/CDNs reuse a page briefly
+_events_cache: "OrderedDict[tuple, Tuple[float, bytes, str]]" = OrderedDict()
+_events_cache_gen = 0
+
+
+def _cache_get(key: tuple) -> Optional[Tuple[bytes, str]]:
+    hit = _events_cache.get(key)
+    if hit is None:
+        return None
+    expires, body, etag = hit
+    if expires < time.monotonic():
+        del _events_cache[key]
+        return None
+    _events_cache.move_to_end(key)
+    return body, etag
+
+
+def _cache_put(key: tuple, gen: int, body: bytes, etag: str) -> None:
+    if EVENTS_CACHE_TTL <= 0 or gen != _events_cache_gen:
+        return
+    _events_cache[key] = (time.monotonic() + EVENTS_CACHE_TTL, body, etag)
+    _events_cache.move_to_end(key)
+    while len(_events_cache) > EVENTS_CACHE_SIZE:
+        _events_cache.popitem(last=False)
+
+
+def _cache_clear() -> None:
+    global _events_cache_gen
+    _events_cache_gen += 1
+    _events_cache.clear()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip() for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@lru_cache(maxsize=16)
+def _iso_second(ts: int) -> str:
+    """UTC ISO-8601 for a whole-second epoch; the same second formats once."""
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    yield
+    await close_db()
+
+
+app = FastAPI(title="Geo Monitor API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +101,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# event JSON (repeated keys, long titles/summaries) compresses several-fold
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 @app.get("/")
@@ -28,53 +115,149 @@ def health():
     return {"status": "ok"}
 
 
-@app.on_event("startup")
-def _startup():
-    init_db()
+# ----------------------------
+# Ingest job
+# ----------------------------
+# One ingest at a time, run after the trigger's response has been sent.
+# "running" is set synchronously in the handler, so two triggers can never
+# both start a job (everything here runs on the event loop).
+_ingest_status: Dict[str, Any] = {
+    "running": False,
+    "last_started_at": None,
+    "last_finished_at": None,
+    "events_ingested": None,
+    "sources": None,
+    "error": None,
+}
 
 
-@app.post("/ingest/run")
-def ingest_run(days: int = Query(7, ge=1, le=90)):
+async def _do_ingest(days: int) -> None:
+    _ingest_status.update(last_started_at=_iso_second(int(time.time())), error=None)
     try:
-        events = run_all(days=days)
-        upsert_events(events)
-        report = getattr(run_all, "last_report", None)
-        return {"status": "success", "events_ingested": len(events), "sources": report}
+        # run_all is blocking network I/O; keep it off the event loop
+        events = await asyncio.to_thread(run_all, days=days)
+        await upsert_events(events)
+        _cache_clear()
+        _ingest_status.update(events_ingested=len(events), sources=getattr(run_all, "last_report", None))
     except Exception as e:
-        tb = traceback.format_exc()
-        raise HTTPException(status_code=500, detail={"error": str(e), "traceback": tb})
+        _ingest_status["error"] = {"error": str(e), "traceback": traceback.format_exc()}
+    finally:
+        _ingest_status.update(running=False, last_finished_at=_iso_second(int(time.time())))
+
+
+@app.post("/ingest/run", status_code=202)
+async def ingest_run(
+    background: BackgroundTasks,
+    response: Response,
+    days: int = Query(7, ge=1, le=90),
+    wait: bool = Query(False, description="Run in the request and return the result (the old blocking behaviour)"),
+):
+    if _ingest_status["running"]:
+        raise HTTPException(status_code=409, detail="ingest already running; see /ingest/status")
+    _ingest_status["running"] = True
+
+    if not wait:
+        background.add_task(_do_ingest, days)
+        return {"status": "accepted", "statusUrl": "/ingest/status"}
+
+    await _do_ingest(days)
+    if _ingest_status["error"]:
+        raise HTTPException(status_code=500, detail=_ingest_status["error"])
+    response.status_code = 200
+    return {"status": "success", "events_ingested": _ingest_status["events_ingested"], "sources": _ingest_status["sources"]}
+
+
+@app.get("/ingest/status")
+def ingest_status():
+    return _ingest_status
 
 
 @app.get("/events")
-def get_events(
+async def get_events(
     material: str = Query("copper"),
     days: int = Query(30, ge=1, le=90),
     risk: str | None = Query(None),
     quality: str | None = Query("OFFICIAL,MAJOR_MEDIA,INDUSTRY"),
     limit: int = Query(200, ge=1, le=500),
-    cursor: str | None = Query(None, description="ISO timestamp cursor for pagination; returns events older than cursor"),
+    cursor: str | None = Query(None, description="nextCursor from the previous page; returns the events after it"),
+    format: str = Query(
+        "json",
+        pattern="^(json|compact|msgpack)$",
+        description='"compact"/"msgpack": events as {"cols": [...], "rows": [[...], ...]} instead of objects',
+    ),
+    fields: str | None = Query(
+        None,
+        description='Comma-separated event fields to return, e.g. "id,title,publishedAt,location"; default all',
+    ),
+    if_none_match: str | None = Header(None),
 ):
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat().replace("+00:00", "Z")
+    if format == "msgpack" and msgpack is None:
+        raise HTTPException(status_code=501, detail="format=msgpack requires the msgpack package")
+    projection = _parse_fields(fields)
+
+    key = (material, days, risk, quality, limit, cursor, format, projection)
+    hit = _cache_get(key)
+    if hit is None:
+        gen = _events_cache_gen
+        body = await _render_events(material, days, risk, quality, limit, cursor, format, projection)
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        _cache_put(key, gen, body, etag)
+    else:
+        body, etag = hit
+
+    headers = {"ETag": etag, "Cache-Control": EVENTS_CACHE_CONTROL}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=_EVENTS_MEDIA_TYPES[format], headers=headers)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Requested field names in request order, or None for whole events."""
+    if not fields or fields.strip().lower() == "all":
+        return None
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in EVENT_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": f"unknown fields: {', '.join(unknown)}", "allowed": list(EVENT_COLUMNS)},
+        )
+    return names or None
+
+
+async def _render_events(
+    material: str,
+    days: int,
+    risk: Optional[str],
+    quality: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    format: str = "json",
+    fields: Optional[Tuple[str, ...]] = None,
+) -> bytes:
+    # second granularity: requests within the same second share the strings
+    now = int(time.time())
+    cutoff = _iso_second(now - days * 86400)
 
     qualities = None
     if quality and quality.strip().upper() != "ALL":
         qualities = {q.strip().upper() for q in quality.split(",") if q.strip()}
 
-    evs, next_cursor = query_events(material, cutoff, risk, qualities, limit=limit, cursor=cursor)
+    payloads: list = []
+    events: list = []
+    if fields:
+        events, markers, next_cursor = await query_event_fields(
+            material, cutoff, risk, qualities, fields, limit=limit, cursor=cursor
+        )
+    else:
+        payloads, markers, next_cursor = await query_event_payloads(
+            material, cutoff, risk, qualities, limit=limit, cursor=cursor
+        )
 
-    markers = 0
-    for e in evs:
-        loc = e.get("location") or {}
-        lat = float(loc.get("lat") or 0.0)
-        lon = float(loc.get("lon") or 0.0)
-        if not (lat == 0.0 and lon == 0.0):
-            markers += 1
-
-    return {
-        "events": evs,
-        "count": len(evs),
+    meta = {
+        "count": len(events) if fields else len(payloads),
         "markersCount": markers,
-        "lastUpdated": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "lastUpdated": _iso_second(now),
         "nextCursor": next_cursor,
         "filters_applied": {
             "material": material,
@@ -85,3 +268,20 @@ def get_events(
             "cursor": cursor,
         },
     }
+
+    if not fields:
+        if format == "json":
+            # splice the stored event JSON straight into the body instead of
+            # decoding every payload only for the response to re-encode it
+            return b"".join((b'{"events":[', b",".join(payloads), b"],", json_dumps(meta)[1:]))
+        events = [json_loads(p) for p in payloads]
+
+    if format == "json":
+        return json_dumps({"events": events, **meta})
+
+    # columnar: field names once in "cols", then one positional row per event
+    cols = fields or EVENT_COLUMNS
+    doc = {"cols": list(cols), "rows": [[e.get(c) for c in cols] for e in events], **meta}
+    if format == "msgpack":
+        return msgpack.packb(doc, use_bin_type=True)
+    return json_dumps(doc)
@@ -1,93 +1,380 @@
+import asyncio
+import functools
+import hashlib
 import json
-import sqlite3
-from typing import Any, Dict, List, Optional, Set, Tuple
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+import aiosqlite
+
+# JSON codec shared by the store, the API and ingest: compact UTF-8 bytes out,
+# bytes or str in.
+try:  # optional: C JSON codec (pip install orjson)
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:  # pragma: no cover
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    json_loads = json.loads
 
 DB = "events.db"
 
+# Reusable connections, opened once (each on its own aiosqlite thread) instead
+# of a connect/PRAGMA/close per call. WAL lets readers run alongside a writer.
+DB_POOL_SIZE = int(os.environ.get("GEO_DB_POOL_SIZE", "4"))
+DB_STATEMENT_CACHE = 256  # prepared statements kept per connection
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",  # KiB, per connection
+    "PRAGMA mmap_size=268435456",  # 256 MiB: reads come from the shared OS page cache without copying
+)
+_POOL: Optional["asyncio.Queue[aiosqlite.Connection]"] = None
 
-def _table_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table})")
-    return {row[1] for row in cur.fetchall()}
+# sourceQuality -> bit of the quality_mask column
+QUALITY_BITS = {"OFFICIAL": 1, "MAJOR_MEDIA": 2, "INDUSTRY": 4, "OTHER": 8}
 
 
-def init_db() -> None:
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
+async def _open() -> aiosqlite.Connection:
+    conn = await aiosqlite.connect(DB, cached_statements=DB_STATEMENT_CACHE)
+    for pragma in _PRAGMAS:
+        await conn.execute(pragma)
+    return conn
 
-    # Base table (compatible with old deployments)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS events (
-          id TEXT PRIMARY KEY,
-          payload TEXT NOT NULL,
-          published_at TEXT NOT NULL,
-          source_quality TEXT NOT NULL
+
+async def _get_pool() -> "asyncio.Queue[aiosqlite.Connection]":
+    global _POOL
+    if _POOL is None:
+        # publish the queue first: concurrent callers just wait in get()
+        # until the connections below are added
+        pool: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        _POOL = pool
+        for _ in range(max(1, DB_POOL_SIZE)):
+            pool.put_nowait(await _open())
+    return _POOL
+
+
+@asynccontextmanager
+async def _conn() -> AsyncIterator[aiosqlite.Connection]:
+    pool = await _get_pool()
+    conn = await pool.get()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:  # an error mid-write: don't hand out an open txn
+            await conn.rollback()
+        pool.put_nowait(conn)
+
+
+async def close_db() -> None:
+    global _POOL
+    pool, _POOL = _POOL, None
+    while pool is not None and not pool.empty():
+        await pool.get_nowait().close()
+
+
+async def _table_columns(conn: aiosqlite.Connection, table: str) -> Set[str]:
+    async with conn.execute(f"PRAGMA table_info({table})") as cur:
+        return {row[1] for row in await cur.fetchall()}
+
+
+async def init_db() -> None:
+    async with _conn() as conn:
+        # Base table (compatible with old deployments)
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+              id TEXT PRIMARY KEY,
+              payload BLOB NOT NULL,
+              published_at TEXT NOT NULL,
+              source_quality TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-    conn.commit()
-
-    cols = _table_columns(conn, "events")
-
-    # Add frontend-friendly filter columns if missing (SQLite supports ADD COLUMN)
-    def add_col(name: str, ddl: str) -> None:
-        nonlocal cols
-        if name not in cols:
-            cur.execute(f"ALTER TABLE events ADD COLUMN {ddl}")
-            conn.commit()
-            cols = _table_columns(conn, "events")
-
-    add_col("material", "material TEXT")
-    add_col("risk_types", "risk_types TEXT")
-    add_col("country_codes", "country_codes TEXT")
-    add_col("lat", "lat REAL")
-    add_col("lon", "lon REAL")
-
-    # Indexes for fast filtering
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_events_published_at ON events(published_at)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_events_material ON events(material)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_events_source_quality ON events(source_quality)")
-    conn.commit()
-    conn.close()
-
-
-def upsert_events(events: List[Dict[str, Any]]) -> None:
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-
-    for e in events:
-        material = (e.get("materials") or [""])[0]
-        risks = ",".join(e.get("riskType") or [])
-        countries = ",".join(e.get("countries") or [])
-        loc = e.get("location") or {}
-        lat = float(loc.get("lat") or 0.0)
-        lon = float(loc.get("lon") or 0.0)
-
-        cur.execute(
+        await conn.commit()
+
+        cols = await _table_columns(conn, "events")
+
+        # Add frontend-friendly filter columns if missing (SQLite supports ADD COLUMN)
+        async def add_col(name: str, ddl: str) -> None:
+            nonlocal cols
+            if name not in cols:
+                await conn.execute(f"ALTER TABLE events ADD COLUMN {ddl}")
+                await conn.commit()
+                cols = await _table_columns(conn, "events")
+
+        await add_col("material", "material TEXT")
+        await add_col("risk_types", "risk_types TEXT")
+        await add_col("country_codes", "country_codes TEXT")
+        await add_col("lat", "lat REAL")
+        await add_col("lon", "lon REAL")
+        await add_col("has_marker", "has_marker INTEGER")
+        await add_col("quality_mask", "quality_mask INTEGER")
+        await add_col("content_hash", "content_hash INTEGER")
+
+        # One row per (event, risk) so the risk filter is an indexed equality
+        # lookup rather than a LIKE over the comma-joined risk_types column
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS event_risks (
+              event_id TEXT NOT NULL,
+              risk TEXT NOT NULL,
+              published_at TEXT NOT NULL,
+              PRIMARY KEY (event_id, risk)
+            ) WITHOUT ROWID
             """
-            INSERT OR REPLACE INTO events
-              (id, payload, published_at, source_quality, material, risk_types, country_codes, lat, lon)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                e["id"],
-                json.dumps(e, ensure_ascii=False),
-                e.get("publishedAt") or "",
-                e.get("sourceQuality", "OTHER"),
-                material,
-                risks,
-                countries,
-                lat,
-                lon,
-            ),
         )
+        await conn.commit()
+
+        await _backfill_columns(conn)
+        # rows whose filter columns predate has_marker: derive it in SQL
+        await conn.execute("UPDATE events SET has_marker = (lat != 0 OR lon != 0) WHERE has_marker IS NULL")
+        # filter columns are stored in canonical case (see _event_row)
+        await conn.execute(
+            "UPDATE events SET material = LOWER(material), source_quality = UPPER(source_quality) "
+            "WHERE material != LOWER(material) OR source_quality != UPPER(source_quality)"
+        )
+        whens = " ".join(f"WHEN '{q}' THEN {bit}" for q, bit in QUALITY_BITS.items())
+        await conn.execute(
+            f"UPDATE events SET quality_mask = CASE source_quality {whens} ELSE 0 END WHERE quality_mask IS NULL"
+        )
+        await conn.commit()
+        await _backfill_risks(conn)
+
+        # Indexes for fast filtering
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_published_at ON events(published_at)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_material ON events(material)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_source_quality ON events(source_quality)")
+        # Keyset order for the cursor: (published_at, id), newest first
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_pa_id ON events(published_at DESC, id DESC)")
+        # quality+material lookups walk this index in keyset order and stop at LIMIT
+        # (replaces the earlier UPPER()/LOWER() expression indexes)
+        await conn.execute("DROP INDEX IF EXISTS idx_events_q_m_pa")
+        await conn.execute("DROP INDEX IF EXISTS idx_events_q_m_pa_id")
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_events_quality_material "
+            "ON events(source_quality, material, published_at DESC, id DESC)"
+        )
+        # risk-filtered queries walk this in keyset order (see _select_sql)
+        await conn.execute("DROP INDEX IF EXISTS idx_event_risks_risk_pa")  # superseded: no event_id tiebreaker
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_event_risks_keyset ON event_risks(risk, published_at DESC, event_id DESC)"
+        )
+        await conn.commit()
+
+
+_UPSERT_SQL = """
+    INSERT OR REPLACE INTO events
+      (id, payload, published_at, source_quality, material, risk_types, country_codes, lat, lon, has_marker,
+       quality_mask, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_RISK_INSERT_SQL = "INSERT OR IGNORE INTO event_risks (event_id, risk, published_at) VALUES (?, ?, ?)"
+
+
+def _content_hash(payload: bytes) -> int:
+    # 64-bit fingerprint of the stored payload, signed to fit an SQLite INTEGER
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "big", signed=True)
+
+
+def _event_row(e: Dict[str, Any]) -> Tuple[Any, ...]:
+    loc = e.get("location") or {}
+    lat = float(loc.get("lat") or 0.0)
+    lon = float(loc.get("lon") or 0.0)
+    payload = json_dumps(e)  # BLOB; rows from older versions may still hold TEXT
+    # canonical case, so queries compare plain columns and can use the indexes
+    quality = e.get("sourceQuality", "OTHER").upper()
+    return (
+        e["id"],
+        payload,
+        e.get("publishedAt") or "",
+        quality,
+        (e.get("materials") or [""])[0].lower(),
+        ",".join(e.get("riskType") or []),
+        ",".join(e.get("countries") or []),
+        lat,
+        lon,
+        int(not (lat == 0.0 and lon == 0.0)),
+        QUALITY_BITS.get(quality, 0),
+        _content_hash(payload),  # keep last: upsert_events compares r[-1]
+    )
+
+
+async def _backfill_columns(conn: aiosqlite.Connection) -> None:
+    """
+    Fill the filter columns of rows written before they existed.
+
+    query_events filters purely in SQL, so a legacy row with NULL columns
+    would never match; derive them once from the stored payload instead.
+    """
+    async with conn.execute("SELECT payload FROM events WHERE material IS NULL") as cur:
+        legacy = await cur.fetchall()
+    if not legacy:
+        return
+    rows = []
+    for (payload,) in legacy:
+        r = _event_row(json_loads(payload))
+        rows.append((*r[4:], r[0]))
+    await conn.execute("BEGIN IMMEDIATE")
+    await conn.executemany(
+        "UPDATE events SET material = ?, risk_types = ?, country_codes = ?, lat = ?, lon = ?, has_marker = ?, "
+        "quality_mask = ?, content_hash = ? WHERE id = ?",
+        rows,
+    )
+    await conn.commit()
+
+
+def _risk_rows(event_id: str, risk_types: str, published_at: str) -> List[Tuple[str, str, str]]:
+    return [(event_id, r, published_at) for r in risk_types.lower().split(",") if r]
+
+
+async def _backfill_risks(conn: aiosqlite.Connection) -> None:
+    """Populate event_risks for rows stored before the table existed."""
+    async with conn.execute(
+        """
+        SELECT id, risk_types, published_at FROM events
+        WHERE risk_types != ''
+          AND NOT EXISTS (SELECT 1 FROM event_risks WHERE event_id = events.id)
+        """
+    ) as cur:
+        missing = await cur.fetchall()
+    if not missing:
+        return
+    await conn.execute("BEGIN IMMEDIATE")
+    await conn.executemany(_RISK_INSERT_SQL, [r for row in missing for r in _risk_rows(*row)])
+    await conn.commit()
+
+
+async def _stored_hashes(conn: aiosqlite.Connection, ids: List[str]) -> Dict[str, Optional[int]]:
+    stored: Dict[str, Optional[int]] = {}
+    for i in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+        chunk = ids[i:i + 500]
+        qmarks = ",".join(["?"] * len(chunk))
+        async with conn.execute(f"SELECT id, content_hash FROM events WHERE id IN ({qmarks})", chunk) as cur:
+            stored.update(await cur.fetchall())
+    return stored
+
+
+async def upsert_events(events: List[Dict[str, Any]]) -> None:
+    # keyed by id: a repeated id keeps its last copy, as INSERT OR REPLACE would
+    by_id = {r[0]: r for r in map(_event_row, events)}
+    if not by_id:
+        return
 
-    conn.commit()
-    conn.close()
+    async with _conn() as conn:
+        # one statement compiled once, all rows in one write transaction
+        # (IMMEDIATE takes the write lock up front instead of on first insert)
+        await conn.execute("BEGIN IMMEDIATE")
+        # re-ingests mostly bring back events already stored byte-for-byte;
+        # skip those instead of rewriting the row, its indexes and risk rows
+        stored = await _stored_hashes(conn, list(by_id))
+        rows = [r for r in by_id.values() if stored.get(r[0]) != r[-1]]
+        if not rows:
+            await conn.commit()
+            return
+        await conn.executemany(_UPSERT_SQL, rows)
+        # replace each event's risk rows wholesale: its risks may have changed
+        await conn.executemany("DELETE FROM event_risks WHERE event_id = ?", [(r[0],) for r in rows])
+        await conn.executemany(_RISK_INSERT_SQL, [x for r in rows for x in _risk_rows(r[0], r[5], r[2])])
+        await conn.commit()
 
 
-def query_events(
+@functools.lru_cache(maxsize=None)
+def _select_sql(
+    material: bool,
+    risk: bool,
+    n_qualities: int,
+    cursor_kind: int,
+    quality_mask: bool = False,
+    columns: Tuple[str, ...] = ("payload",),
+) -> str:
+    """
+    SQL text for one filter shape, built once.
+
+    Identical text per shape is also what lets sqlite3's statement cache
+    skip re-preparing it. Optional filters stay out of the text rather than
+    being bound as "? IS NULL OR ..." so every shape keeps its index seek.
+    """
+    if risk:
+        # Drive the query from event_risks: idx_event_risks_keyset yields that
+        # risk's rows already in keyset order, and events is probed by id.
+        src = "event_risks er JOIN events ON events.id = er.event_id"
+        pa, key = "er.published_at", "er.event_id"
+    else:
+        src = "events"
+        pa, key = "events.published_at", "events.id"
+    where = [f"{pa} >= ?"]
+    if material:
+        where.append("events.material = ?")
+    if risk:
+        where.append("er.risk = ?")
+    if quality_mask:
+        where.append("(events.quality_mask & ?) != 0")
+    elif n_qualities:
+        where.append(f"events.source_quality IN ({','.join(['?'] * n_qualities)})")
+    if cursor_kind == 2:
+        where.append(f"({pa}, {key}) < (?, ?)")
+    elif cursor_kind == 1:
+        where.append(f"{pa} < ?")
+    return f"""
+      SELECT {pa}, {key}, events.has_marker, {", ".join("events." + c for c in columns)}
+      FROM {src}
+      WHERE {" AND ".join(where)}
+      ORDER BY {pa} DESC, {key} DESC
+      LIMIT ?
+    """
+
+
+async def _select_events(
+    material: str,
+    since_iso: str,
+    risk: Optional[str],
+    qualities: Optional[Set[str]],
+    limit: int,
+    cursor: Optional[str],
+    columns: Tuple[str, ...] = ("payload",),
+) -> List[Tuple[Any, ...]]:
+    """Rows of (published_at, id, has_marker, *columns), newest first."""
+    args: List[Any] = [since_iso]
+    if material:
+        args.append(material.lower())
+    if risk:
+        args.append(risk.lower())
+    quals = sorted({q.upper() for q in qualities}) if qualities else []
+    # Several known qualities: one "&" against the mask, one bind for any mix.
+    # A single quality keeps "= ?" so it can seek the quality/material index
+    # (the mask can't be indexed, which hurts most for a rare quality).
+    by_mask = len(quals) > 1 and all(q in QUALITY_BITS for q in quals)
+    if by_mask:
+        args.append(sum(QUALITY_BITS[q] for q in quals))
+    else:
+        args.extend(quals)
+    cursor_kind = 0
+    if cursor:
+        cursor_at, sep, cursor_id = cursor.rpartition("|")
+        if sep:
+            cursor_kind = 2
+            args.extend([cursor_at, cursor_id])
+        else:  # bare ISO timestamp (cursors issued before the id tiebreaker)
+            cursor_kind = 1
+            args.append(cursor)
+    args.append(limit)
+    sql = _select_sql(bool(material), bool(risk), 0 if by_mask else len(quals), cursor_kind, by_mask, columns)
+
+    async with _conn() as conn, conn.execute(sql, args) as cur:
+        return await cur.fetchall()
+
+
+def _next_cursor(rows: List[Tuple[Any, ...]]) -> Optional[str]:
+    if not rows:
+        return None
+    published_at, event_id = rows[-1][:2]  # last row's keyset position
+    return f"{published_at}|{event_id}"
+
+
+async def query_events(
     material: str,
     since_iso: str,
     risk: Optional[str],
@@ -99,51 +386,84 @@ def query_events(
     Query events with lightweight SQL filtering + cursor pagination.
 
     cursor:
-      - an ISO timestamp; returns events strictly older than cursor.
+      - "<published_at>|<id>" as returned in next_cursor; returns the events
+        after that one in (published_at DESC, id DESC) order. A bare ISO
+        timestamp is still accepted and returns events strictly older.
 
     Returns:
       (events, next_cursor)
     """
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
+    rows = await _select_events(material, since_iso, risk, qualities, limit, cursor)
+    events = [json_loads(row[3]) for row in rows]
+    return events, _next_cursor(rows)
 
-    where = ["published_at >= ?"]
-    args: List[Any] = [since_iso]
 
-    if material:
-        where.append("LOWER(material) = LOWER(?)")
-        args.append(material)
+async def query_event_payloads(
+    material: str,
+    since_iso: str,
+    risk: Optional[str],
+    qualities: Optional[Set[str]],
+    limit: int = 200,
+    cursor: Optional[str] = None,
+) -> Tuple[List[bytes], int, Optional[str]]:
+    """
+    Same query as query_events, but hands back the stored JSON untouched.
 
-    if risk:
-        where.append("LOWER(risk_types) LIKE ?")
-        args.append(f"%{risk.lower()}%")
+    Returns:
+      (payloads, markers_count, next_cursor) -- payloads are UTF-8 JSON
+      objects ready to be spliced into a response; markers_count sums the
+      has_marker flag stored at upsert, so nothing has to be decoded.
+    """
+    rows = await _select_events(material, since_iso, risk, qualities, limit, cursor)
+    payloads = [p if isinstance(p, bytes) else p.encode("utf-8") for _, _, _, p in rows]
+    markers = sum(has_marker for _, _, has_marker, _ in rows)
+    return payloads, markers, _next_cursor(rows)
 
-    if qualities:
-        qmarks = ",".join(["?"] * len(qualities))
-        where.append(f"UPPER(source_quality) IN ({qmarks})")
-        args.extend([q.upper() for q in qualities])
 
-    if cursor:
-        where.append("published_at < ?")
-        args.append(cursor)
+# Event fields that have a column of their own (csv columns are split back)
+_FIELD_COLUMNS = {
+    "id": "id",
+    "publishedAt": "published_at",
+    "sourceQuality": "source_quality",
+    "riskType": "risk_types",
+    "countries": "country_codes",
+}
+_CSV_FIELDS = {"riskType", "countries"}
 
-    sql = f"""
-      SELECT payload, published_at
-      FROM events
-      WHERE {" AND ".join(where)}
-      ORDER BY published_at DESC
-      LIMIT ?
-    """
-    args.append(limit)
 
-    cur.execute(sql, args)
-    rows = cur.fetchall()
-    conn.close()
+async def query_event_fields(
+    material: str,
+    since_iso: str,
+    risk: Optional[str],
+    qualities: Optional[Set[str]],
+    fields: Sequence[str],
+    limit: int = 200,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
+    """
+    Same query as query_events, with each event cut down to `fields`.
 
-    events: List[Dict[str, Any]] = []
-    next_cursor = None
-    for payload, published_at in rows:
-        events.append(json.loads(payload))
-        next_cursor = published_at  # last row's timestamp
+    When every requested field has its own column (see _FIELD_COLUMNS) the
+    events are built from those columns and no payload is read or decoded;
+    otherwise the payload is decoded and projected.
 
-    return events, next_cursor
+    Returns:
+      (events, markers_count, next_cursor)
+    """
+    if all(f in _FIELD_COLUMNS for f in fields):
+        columns = tuple(_FIELD_COLUMNS[f] for f in fields)
+        rows = await _select_events(material, since_iso, risk, qualities, limit, cursor, columns)
+        events = []
+        for row in rows:
+            e = dict(zip(fields, row[3:]))
+            for f in _CSV_FIELDS.intersection(e):
+                e[f] = e[f].split(",") if e[f] else []
+            events.append(e)
+    else:
+        rows = await _select_events(material, since_iso, risk, qualities, limit, cursor)
+        events = []
+        for row in rows:
+            full = json_loads(row[3])
+            events.append({f: full.get(f) for f in fields})
+    markers = sum(row[2] for row in rows)
+    return events, markers, _next_cursor(rows)
@@ -0,0 +1,126 @@
+"""
+Regression check for the keyword / geo matchers.
+
+ingest.py matches keywords and geo hints with Aho-Corasick automata (plus
+word-boundary emulation) when pyahocorasick is installed, and with a
+literal-gated regex fallback otherwise. Both must behave exactly like the
+straightforward implementation below: substring `in` checks for keywords,
+and one `re.search(pattern, IGNORECASE)` per hint in table order for geo.
+"""
+import random
+import re
+import unittest
+from typing import List, Optional, Tuple
+from unittest import mock
+
+import ingest
+
+_REGIONS = [(re.compile(p, re.IGNORECASE), iso2, lat, lon) for p, iso2, lat, lon in ingest.REGION_HINTS]
+_COUNTRIES = [(re.compile(p, re.IGNORECASE), iso2, lat, lon) for p, iso2, lat, lon in ingest.COUNTRY_HINTS]
+
+
+def ref_extract_geo(text: str) -> Tuple[List[str], Optional[Tuple[float, float]], str]:
+    tl = (text or "").lower()
+    for key, iso2s, lat, lon in ingest.ENTITY_GEO_HINTS:
+        if key and key in tl:
+            return iso2s, (float(lat), float(lon)), "entity"
+    for layer, precision in ((_REGIONS, "region"), (_COUNTRIES, "country")):
+        hits: List[str] = []
+        centroid = None
+        for pat, iso2, lat, lon in layer:
+            if pat.search(text or ""):
+                if iso2 not in hits:
+                    hits.append(iso2)
+                if centroid is None:
+                    centroid = (float(lat), float(lon))
+        if hits:
+            return hits, centroid, precision
+    return [], None, "global"
+
+
+def ref_keywords(text: str) -> Tuple[bool, List[str], int]:
+    t = (text or "").lower()
+    risks = [risk for risk, kws in ingest.RISK_KW.items() if any(kw in t for kw in kws)] or ["other"]
+    score = 25
+    for bonus, kws in ingest.SEVERITY_TIERS:
+        if any(kw in t for kw in kws):
+            score += bonus
+            break
+    if "sanctions" in risks or "conflict" in risks:
+        score += 10
+    if "policy" in risks:
+        score += 5
+    if "logistics" in risks:
+        score += 5
+    return any(kw in t for kw in ingest.COPPER_KW), risks, max(0, min(100, score))
+
+
+# Word-boundary edge cases the automata have to get right.
+_TRICKY = [
+    "u.s.a", "U.S. ", "U.S.", "the u.s.x", "bc's", "WA-based", "kuwait", "eu-wide", "UK's", "_uk_", "éuk",
+    "uké", "İstanbul India", "Türkiye", "TURKIYE", "Congo-Kinshasa", "congo-brazzaville",
+    "republic of the congo", "DRC.", "d.r.c", "dr.c.", "drc1", "azure", "AZ", "palestinians", "Gaza—",
+    "west bank!", "saudi arabia", "americans", "america's", "korea-", "south  korea", "new\nzealand",
+    "ΑΘΗΝΑ usa", "usa_", "9usa", "usa9", "ChinaTown", "china-town", "“china”", "(eu)", "e.u.", "U S",
+    " cu ", "Cu", "tcrc", "sdn", "copper-", "mining's",
+]
+
+
+def _corpus(n: int, seed: int) -> List[str]:
+    words = list(_TRICKY)
+    words += [key for key, _, _, _ in ingest.ENTITY_GEO_HINTS]
+    for pat, _, _, _ in ingest.REGION_HINTS + ingest.COUNTRY_HINTS:
+        # rough literal skeleton of each pattern, e.g. r"\bu\.?s\.?\b" -> "u.s."
+        words += [w for w in re.sub(r"\\[bw]\*?|[()?*+^$\[\]]|\\", " ", pat).split("|") if w.strip()]
+    words += ingest.COPPER_KW + [kw for kws in ingest.RISK_KW.values() for kw in kws]
+    seps = [" ", " ", " ", "", "-", ",", ".", "\n", "'s ", "_", "é", "9", "  "]
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        parts = [rng.choice(words) for _ in range(rng.randint(1, 8))]
+        text = "".join(p + rng.choice(seps) for p in parts)
+        out.append(text.upper() if rng.random() < 0.1 else text)
+    return out + _TRICKY
+
+
+class _MatchingParity:
+    def setUp(self):
+        ingest._extract_geo_cached.cache_clear()
+        ingest._keyword_mask_l.cache_clear()
+        self.addCleanup(ingest._extract_geo_cached.cache_clear)
+        self.addCleanup(ingest._keyword_mask_l.cache_clear)
+        self.cases = _corpus(4000, seed=11)
+
+    def test_extract_geo(self):
+        for text in self.cases:
+            self.assertEqual(ingest.extract_geo(text), ref_extract_geo(text), repr(text))
+
+    def test_extract_geo_batch(self):
+        self.assertEqual(ingest.extract_geo_batch(self.cases), [ref_extract_geo(t) for t in self.cases])
+
+    def test_keywords(self):
+        for text in self.cases:
+            copper, risks, severity = ref_keywords(text)
+            self.assertEqual(ingest._is_copper(text), copper, repr(text))
+            self.assertEqual(ingest._risk_types(text), risks, repr(text))
+            self.assertEqual(ingest._severity(text, risks), severity, repr(text))
+
+
+@unittest.skipIf(ingest.ahocorasick is None, "pyahocorasick not installed")
+class AutomatonMatchingTest(_MatchingParity, unittest.TestCase):
+    pass
+
+
+class FallbackMatchingTest(_MatchingParity, unittest.TestCase):
+    """The code path taken when pyahocorasick is not installed."""
+
+    def setUp(self):
+        for name in ("_GEO_AC", "_ENTITY_AC", "_KW_AC"):
+            patcher = mock.patch.object(ingest, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import store
+
+
+def _event(i: int, risks, quality="OFFICIAL"):
+    return {
+        "id": f"ev{i:04d}",
+        "title": f"Copper event {i}",
+        "publishedAt": f"2024-01-{1 + i % 28:02d}T00:00:00Z",
+        "sourceQuality": quality,
+        "materials": ["Copper"],
+        "riskType": risks,
+        "countries": ["CL"],
+        "location": {"name": "CL", "lat": -33.4, "lon": -70.6, "precision": "country"},
+    }
+
+
+class RiskQueryPlanTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._db = store.DB
+        store.DB = os.path.join(self._tmp.name, "events.db")
+        events = [_event(i, ["policy"] if i % 3 else ["labor", "sanctions"]) for i in range(60)]
+
+        async def seed():
+            await store.init_db()
+            await store.upsert_events(events)
+            await store.close_db()
+
+        asyncio.run(seed())
+
+    def tearDown(self):
+        store.DB = self._db
+        self._tmp.cleanup()
+
+    def _plan(self, *shape):
+        sql = store._select_sql(*shape)
+        with sqlite3.connect(store.DB) as conn:
+            return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ["x"] * sql.count("?"))]
+
+    def test_risk_filter_walks_event_risks_keyset_index(self):
+        # (material, risk, n_qualities, cursor_kind, quality_mask)
+        for shape in [(False, True, 0, 0), (True, True, 1, 2), (True, True, 0, 1, True)]:
+            plan = " | ".join(self._plan(*shape))
+            self.assertIn("idx_event_risks_keyset", plan, shape)
+            self.assertNotIn("TEMP B-TREE", plan, shape)
+
+    def test_risk_filter_pages_without_gaps(self):
+        async def walk():
+            everything, _ = await store.query_events("copper", "2000", "policy", None, limit=1000)
+            paged, cursor = [], None
+            while True:
+                page, cursor = await store.query_events("copper", "2000", "policy", None, limit=7, cursor=cursor)
+                paged.extend(e["id"] for e in page)
+                if len(page) < 7:
+                    break
+            await store.close_db()
+            return [e["id"] for e in everything], paged
+
+        everything, paged = asyncio.run(walk())
+        self.assertEqual(len(everything), 40)
+        self.assertEqual(paged, everything)
+
+
+if __name__ == "__main__":
+    unittest.main()